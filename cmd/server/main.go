@@ -6,6 +6,9 @@ import (
 	"net/http"
 	"os"
 	"os/signal"
+	"path"
+	"path/filepath"
+	"strings"
 	"syscall"
 	"time"
 
@@ -27,15 +30,18 @@ func main() {
 	hub := websocket.NewHub()
 	go hub.Run()
 	go hub.StartTicker()
-	downloader := download.New(store, hub, cfg.DownloadDir)
+	downloader := download.New(store, hub, cfg.DownloadDir, cfg.ChunkSize, cfg.Concurrency)
 	downloader.Start()
 
 	r := chi.NewRouter()
 	r.Handle("/", http.FileServer(http.Dir("static")))
+	// http.FileServer streams via sendfile, so serving finished files
+	// costs no userspace copies.
+	r.Handle("/downloads/*", noDirListing(cfg.DownloadDir, http.StripPrefix("/downloads/", http.FileServer(http.Dir(cfg.DownloadDir)))))
 	r.Get("/queue", handler.GetQueueHandler(store))
-	r.Post("/queue", handler.AddToQueueHandler(store, hub))
+	r.Post("/queue", handler.AddToQueueHandler(store, hub, downloader))
 	r.Put("/queue/{id}/move", handler.MoveQueueItemHandler(store, hub))
-	r.Put("/queue/{id}/retry", handler.RetryHandler(store, hub))
+	r.Put("/queue/{id}/retry", handler.RetryHandler(store, hub, downloader))
 	r.Put("/queue/{id}/cancelDownload", handler.CancelDownloadHandler(downloader, hub))
 	r.Delete("/queue/{id}", handler.DeleteQueueItemHandler(store, hub))
 	r.Delete("/queue/failed", handler.ClearFailedHandler(store, hub))
@@ -57,6 +63,9 @@ func main() {
 		if err := server.Shutdown(ctx); err != nil {
 			slog.Error("Server forced to shutdown")
 		}
+		if err := store.Flush(); err != nil {
+			slog.Error("Failed to flush queue on shutdown", "error", err)
+		}
 		done <- true
 	}()
 
@@ -68,6 +77,24 @@ func main() {
 	slog.Info("Server exited")
 }
 
+// noDirListing serves only files: directory requests, which would
+// otherwise get http.FileServer's auto-generated index, return 404.
+func noDirListing(root string, next http.Handler) http.Handler {
+	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		if strings.HasSuffix(r.URL.Path, "/") {
+			http.NotFound(w, r)
+			return
+		}
+		name := strings.TrimPrefix(r.URL.Path, "/downloads/")
+		target := filepath.Join(root, filepath.FromSlash(path.Clean("/"+name)))
+		if info, err := os.Stat(target); err == nil && info.IsDir() {
+			http.NotFound(w, r)
+			return
+		}
+		next.ServeHTTP(w, r)
+	})
+}
+
 func SetupLogger(level slog.Level) {
 	handler := tint.NewHandler(os.Stderr, &tint.Options{
 		Level:      level,
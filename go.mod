@@ -7,9 +7,7 @@ require (
 	github.com/go-chi/chi/v5 v5.2.4
 	github.com/gorilla/websocket v1.5.3
 	github.com/lmittmann/tint v1.1.2
+	golang.org/x/net v0.47.0
 )
 
-require (
-	github.com/andybalholm/cascadia v1.3.3 // indirect
-	golang.org/x/net v0.47.0 // indirect
-)
+require github.com/andybalholm/cascadia v1.3.3 // indirect
@@ -3,14 +3,22 @@ package config
 import (
 	"log/slog"
 	"os"
+	"strconv"
 	"strings"
 )
 
+const (
+	defaultChunkSize   = 1024 * 1024
+	defaultConcurrency = 3
+)
+
 type Config struct {
 	Port        string
 	LogLevel    slog.Level
 	DataDir     string
 	DownloadDir string
+	ChunkSize   int
+	Concurrency int
 }
 
 func LoadConfig() Config {
@@ -43,5 +51,21 @@ func LoadConfig() Config {
 	if DownloadDir == "" {
 		DownloadDir = "./downloads"
 	}
-	return Config{Port: port, LogLevel: logLevel, DataDir: DataDir, DownloadDir: DownloadDir}
+	chunkSize := defaultChunkSize
+	if chunkSizeString := os.Getenv("DOWNLOAD_CHUNK_SIZE"); chunkSizeString != "" {
+		if parsed, err := strconv.Atoi(chunkSizeString); err == nil && parsed > 0 {
+			chunkSize = parsed
+		} else {
+			slog.Warn("Invalid DOWNLOAD_CHUNK_SIZE, using default", "value", chunkSizeString, "default", defaultChunkSize)
+		}
+	}
+	concurrency := defaultConcurrency
+	if concurrencyString := os.Getenv("DOWNLOAD_CONCURRENCY"); concurrencyString != "" {
+		if parsed, err := strconv.Atoi(concurrencyString); err == nil && parsed > 0 {
+			concurrency = parsed
+		} else {
+			slog.Warn("Invalid DOWNLOAD_CONCURRENCY, using default", "value", concurrencyString, "default", defaultConcurrency)
+		}
+	}
+	return Config{Port: port, LogLevel: logLevel, DataDir: DataDir, DownloadDir: DownloadDir, ChunkSize: chunkSize, Concurrency: concurrency}
 }
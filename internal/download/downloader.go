@@ -1,6 +1,8 @@
 package download
 
 import (
+	"bufio"
+	"context"
 	"fmt"
 	"io"
 	"log/slog"
@@ -10,12 +12,11 @@ import (
 	"net/url"
 	"os"
 	"path/filepath"
-	"regexp"
 	"strings"
 	"sync"
 	"time"
 
-	"github.com/PuerkitoBio/goquery"
+	"golang.org/x/net/html"
 
 	"fsqdgo/internal/models"
 	"fsqdgo/internal/storage"
@@ -23,7 +24,6 @@ import (
 )
 
 const (
-	chunkSize         = 1024 * 1024
 	progressDelay     = 4 * time.Second
 	userAgent         = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 	maxRetries        = 5
@@ -35,57 +35,115 @@ type Downloader struct {
 	store       *storage.Storage
 	hub         *websocket.Hub
 	downloadDir string
+	chunkSize   int
+	workers     int
+	client      *http.Client
+	wake        chan struct{}
 	cancelCh    map[string]chan struct{}
 	cancelMu    sync.Mutex
+	inflight    map[string]struct{}
+	inflightMu  sync.Mutex
 }
 
-func New(store *storage.Storage, hub *websocket.Hub, downloadDir string) *Downloader {
+func New(store *storage.Storage, hub *websocket.Hub, downloadDir string, chunkSize int, workers int) *Downloader {
 	os.MkdirAll(downloadDir, os.ModePerm)
+	// One pooled client for all requests so retries and consecutive
+	// queue items reuse the TCP+TLS connection to fastshare.cloud.
+	client := &http.Client{
+		Transport: &http.Transport{
+			MaxIdleConnsPerHost: 10,
+			IdleConnTimeout:     60 * time.Second,
+		},
+	}
 	return &Downloader{
 		store:       store,
 		hub:         hub,
 		downloadDir: downloadDir,
+		chunkSize:   chunkSize,
+		workers:     workers,
+		client:      client,
+		wake:        make(chan struct{}, 1),
 		cancelCh:    make(map[string]chan struct{}),
+		inflight:    make(map[string]struct{}),
+	}
+}
+
+// lockPath reserves a target file path so two workers can never write
+// to the same file at once (duplicate links sanitize to the same name).
+func (d *Downloader) lockPath(path string) bool {
+	d.inflightMu.Lock()
+	defer d.inflightMu.Unlock()
+	if _, busy := d.inflight[path]; busy {
+		return false
+	}
+	d.inflight[path] = struct{}{}
+	return true
+}
+
+func (d *Downloader) unlockPath(path string) {
+	d.inflightMu.Lock()
+	delete(d.inflight, path)
+	d.inflightMu.Unlock()
+}
+
+// Wake nudges the worker to re-check the pending queue. The buffered
+// channel coalesces signals, so calling it repeatedly is cheap.
+func (d *Downloader) Wake() {
+	select {
+	case d.wake <- struct{}{}:
+	default:
 	}
 }
 
 func (d *Downloader) Start() {
-	go d.worker()
+	for i := 0; i < d.workers; i++ {
+		go d.worker()
+	}
 }
 
 func (d *Downloader) worker() {
 	for {
-		queue := d.store.GetQueue()
-		if len(queue.Pending) == 0 {
-			time.Sleep(2 * time.Second)
+		item, ok := d.store.ClaimNextPending()
+		if !ok {
+			<-d.wake
 			continue
 		}
-
-		item := queue.Pending[0]
-		d.downloadItem(&item)
+		// Cascade the wakeup: coalesced Wake signals only roused this
+		// worker, so nudge the next idle one to check for more work
+		// before settling into a potentially long download.
+		d.Wake()
+		d.downloadItem(item)
 	}
 }
 
 func (d *Downloader) downloadItem(item *models.Item) {
 	slog.Info("Downloading", "id", item.Id, "name", item.Name)
+	d.hub.BroadcastUpdate()
 
-	if _, ok := d.store.MoveToDownloading(item.Id); !ok {
-		slog.Warn("Failed to move to downloading", "id", item.Id)
-		return
+	// The form action captured when the item was queued saves a page
+	// fetch; fall back to fetching it for items queued before it existed.
+	formURL := item.FormURL
+	if formURL == "" {
+		var err error
+		formURL, err = d.getDownloadURL(item.Link)
+		if err != nil {
+			d.fail(item, err)
+			return
+		}
 	}
-	d.hub.BroadcastUpdate()
 
-	formURL, err := d.getDownloadURL(item.Link)
-	if err != nil {
-		d.fail(item, err)
+	filePath := filepath.Join(d.downloadDir, sanitizeName(item.Name))
+	if !d.lockPath(filePath) {
+		d.fail(item, fmt.Errorf("another download is already writing to %s", filepath.Base(filePath)))
 		return
 	}
+	defer d.unlockPath(filePath)
 
 	cancel := make(chan struct{})
 	d.setCancel(item.Id, cancel)
 	defer d.clearCancel(item.Id)
 
-	if err := d.downloadFile(item, formURL, cancel); err != nil {
+	if err := d.downloadFile(item, formURL, filePath, cancel); err != nil {
 		d.fail(item, err)
 		return
 	}
@@ -96,29 +154,23 @@ func (d *Downloader) downloadItem(item *models.Item) {
 }
 
 func (d *Downloader) getDownloadURL(pageURL string) (string, error) {
-	client := &http.Client{Timeout: 30 * time.Second}
+	ctx, cancel := context.WithTimeout(context.Background(), 30*time.Second)
+	defer cancel()
 
-	resp, err := client.Get(pageURL)
+	req, _ := http.NewRequestWithContext(ctx, http.MethodGet, pageURL, nil)
+	resp, err := d.client.Do(req)
 	if err != nil {
 		return "", err
 	}
 	defer resp.Body.Close()
 
-	doc, err := goquery.NewDocumentFromReader(resp.Body)
+	formAction, err := findFreeFormAction(resp.Body)
 	if err != nil {
 		return "", err
 	}
 
-	var formAction string
-	doc.Find("form").Each(func(_ int, s *goquery.Selection) {
-		if action, ok := s.Attr("action"); ok && strings.HasPrefix(action, "/free/") {
-			formAction = action
-		}
-	})
-
 	if formAction == "" {
-		html, _ := doc.Html()
-		slog.Error("Could not find download form", "url", pageURL, "html", html)
+		slog.Error("Could not find download form", "url", pageURL)
 		return "", fmt.Errorf("download form not found")
 	}
 
@@ -127,7 +179,36 @@ func (d *Downloader) getDownloadURL(pageURL string) (string, error) {
 	return formURL.String(), nil
 }
 
-func (d *Downloader) downloadFile(item *models.Item, formURL string, cancel <-chan struct{}) error {
+// findFreeFormAction scans the token stream for the first form whose
+// action starts with /free/, without building a DOM for the whole page.
+func findFreeFormAction(r io.Reader) (string, error) {
+	tokenizer := html.NewTokenizer(r)
+	for {
+		switch tokenizer.Next() {
+		case html.ErrorToken:
+			if err := tokenizer.Err(); err != io.EOF {
+				return "", err
+			}
+			return "", nil
+		case html.StartTagToken, html.SelfClosingTagToken:
+			name, hasAttr := tokenizer.TagName()
+			if string(name) != "form" || !hasAttr {
+				continue
+			}
+			for {
+				key, val, more := tokenizer.TagAttr()
+				if string(key) == "action" && strings.HasPrefix(string(val), "/free/") {
+					return string(val), nil
+				}
+				if !more {
+					break
+				}
+			}
+		}
+	}
+}
+
+func (d *Downloader) downloadFile(item *models.Item, formURL string, filePath string, cancel <-chan struct{}) error {
 	var lastErr error
 
 	for attempt := 1; attempt <= maxRetries; attempt++ {
@@ -139,7 +220,7 @@ func (d *Downloader) downloadFile(item *models.Item, formURL string, cancel <-ch
 
 		slog.Info("Download attempt", "id", item.Id, "attempt", attempt, "max", maxRetries)
 
-		err := d.attemptDownload(item, formURL, cancel)
+		err := d.attemptDownload(item, formURL, filePath, cancel)
 		if err == nil {
 			return nil // Success
 		}
@@ -163,39 +244,72 @@ func (d *Downloader) downloadFile(item *models.Item, formURL string, cancel <-ch
 	return fmt.Errorf("download failed after %d attempts: %w", maxRetries, lastErr)
 }
 
-func (d *Downloader) attemptDownload(item *models.Item, formURL string, cancel <-chan struct{}) error {
-	resp, err := d.doDownloadRequest(formURL)
+func (d *Downloader) attemptDownload(item *models.Item, formURL string, filePath string, cancel <-chan struct{}) error {
+	// Pick up where a previous attempt left off instead of restarting
+	// multi-GB transfers from byte zero.
+	var offset int64
+	if info, err := os.Stat(filePath); err == nil {
+		offset = info.Size()
+	}
+	if item.Size > 0 && offset >= item.Size {
+		offset = 0
+	}
+
+	resp, err := d.doDownloadRequest(formURL, offset, item.ETag)
 	if err != nil {
 		return err
 	}
 	defer resp.Body.Close()
 
+	if e := resp.Header.Get("ETag"); e != "" {
+		item.ETag = e
+	}
+
+	resumed := offset > 0 && resp.StatusCode == http.StatusPartialContent
 	if resp.ContentLength > 0 {
-		item.Size = resp.ContentLength
+		if resumed {
+			item.Size = offset + resp.ContentLength
+		} else {
+			item.Size = resp.ContentLength
+		}
 	}
 
-	filePath := filepath.Join(d.downloadDir, sanitizeName(item.Name))
-	// Overwrite file on each attempt
-	file, err := os.Create(filePath)
+	// Persist the validator and corrected size so a resume after a user
+	// retry or a process restart still sends If-Range.
+	d.store.UpdateDownloadingItem(*item)
+
+	var file *os.File
+	if resumed {
+		file, err = os.OpenFile(filePath, os.O_WRONLY|os.O_APPEND, 0o644)
+	} else {
+		// Server sent the whole file (or the range was refused); overwrite.
+		offset = 0
+		file, err = os.Create(filePath)
+	}
 	if err != nil {
 		return err
 	}
 	defer file.Close()
 
-	return d.copyWithProgress(resp.Body, file, item, cancel)
+	return d.copyWithProgress(resp.Body, file, item, offset, cancel)
 }
 
-func (d *Downloader) doDownloadRequest(formURL string) (*http.Response, error) {
-	client := &http.Client{}
+func (d *Downloader) doDownloadRequest(formURL string, offset int64, etag string) (*http.Response, error) {
 	req, _ := http.NewRequest("POST", formURL, nil)
 	req.Header.Set("User-Agent", userAgent)
+	if offset > 0 {
+		req.Header.Set("Range", fmt.Sprintf("bytes=%d-", offset))
+		if etag != "" {
+			req.Header.Set("If-Range", etag)
+		}
+	}
 
-	resp, err := client.Do(req)
+	resp, err := d.client.Do(req)
 	if err != nil {
 		return nil, err
 	}
 
-	if resp.StatusCode != http.StatusOK {
+	if resp.StatusCode != http.StatusOK && resp.StatusCode != http.StatusPartialContent {
 		resp.Body.Close()
 		return nil, fmt.Errorf("server error: %s", resp.Status)
 	}
@@ -237,54 +351,100 @@ func (d *Downloader) doDownloadRequest(formURL string) (*http.Response, error) {
 	return resp, nil
 }
 
-func (d *Downloader) copyWithProgress(src io.Reader, dst *os.File, item *models.Item, cancel <-chan struct{}) error {
-	var total int64
-	buf := make([]byte, chunkSize)
+func (d *Downloader) copyWithProgress(src io.Reader, dst *os.File, item *models.Item, offset int64, cancel <-chan struct{}) error {
+	total := offset
 	lastReport := time.Now()
 	reportedBytes := 0
 
 	progress := &websocket.ProgressUpdate{Type: "progress", ItemID: item.Id}
 
+	// Two buffers rotate between this loop and a writer goroutine so the
+	// disk write of one chunk overlaps the socket read of the next.
+	free := make(chan []byte, 2)
+	free <- make([]byte, d.chunkSize)
+	free <- make([]byte, d.chunkSize)
+	writes := make(chan []byte, 2)
+	writeDone := make(chan error, 1)
+	errored := make(chan struct{})
+
+	go func() {
+		// Reads often return less than a full chunk; buffering batches
+		// them into chunk-sized write syscalls. Full chunks bypass the
+		// buffer and go straight to the file.
+		w := bufio.NewWriterSize(dst, d.chunkSize)
+		var werr error
+		for chunk := range writes {
+			if werr == nil {
+				if _, werr = w.Write(chunk); werr != nil {
+					// Tell the read loop right away so it stops
+					// downloading bytes that can't be stored.
+					close(errored)
+				}
+			}
+			free <- chunk[:cap(chunk)]
+		}
+		if werr == nil {
+			werr = w.Flush()
+		}
+		writeDone <- werr
+	}()
+
+	finish := func(err error) error {
+		close(writes)
+		werr := <-writeDone
+		if err != nil {
+			return err
+		}
+		return werr
+	}
+
 	for {
 		select {
 		case <-cancel:
 			progress.DownloadSpeed = ""
 			d.hub.BroadcastProgress(progress)
-			return fmt.Errorf("cancelled")
+			return finish(fmt.Errorf("cancelled"))
+		case <-errored:
+			return finish(nil)
 		default:
-			n, err := src.Read(buf)
-			if n > 0 {
-				if _, werr := dst.Write(buf[:n]); werr != nil {
-					return werr
-				}
-				total += int64(n)
-				reportedBytes += n
+		}
+
+		buf := <-free
+		n, err := src.Read(buf)
+		if n > 0 {
+			writes <- buf[:n]
+			total += int64(n)
+			reportedBytes += n
 
+			// Percent and speed are only needed when a report goes out,
+			// so keep them off the per-chunk path.
+			if elapsed := time.Since(lastReport); elapsed >= progressDelay {
 				if item.Size > 0 {
 					progress.Progress = int(float64(total) / float64(item.Size) * 100)
 				}
+				progress.DownloadSpeed = formatSpeed(float64(reportedBytes) / elapsed.Seconds())
+				d.hub.BroadcastProgress(progress)
 
-				if time.Since(lastReport) >= progressDelay {
-					speed := float64(reportedBytes) / time.Since(lastReport).Seconds()
-					progress.DownloadSpeed = formatSpeed(speed)
-					d.hub.BroadcastProgress(progress)
-
-					lastReport = time.Now()
-					reportedBytes = 0
-				}
+				lastReport = time.Now()
+				reportedBytes = 0
 			}
+		} else {
+			free <- buf
+		}
 
-			if err == io.EOF {
-				progress.Progress = 100
-				d.hub.BroadcastProgress(progress)
-				return nil
-			}
-			if err != nil {
-				return err
-			}
-			if n == 0 {
-				time.Sleep(10 * time.Millisecond)
+		if err == io.EOF {
+			if werr := finish(nil); werr != nil {
+				return werr
 			}
+			progress.Progress = 100
+			d.hub.BroadcastProgress(progress)
+			return nil
+		}
+		if err != nil {
+			return finish(err)
+		}
+		if n == 0 {
+			time.Sleep(10 * time.Millisecond)
 		}
 	}
 }
@@ -319,7 +479,15 @@ func (d *Downloader) clearCancel(id string) {
 }
 
 func sanitizeName(name string) string {
-	return regexp.MustCompile(`[^a-zA-Z0-9-_. ]`).ReplaceAllString(name, "")
+	return strings.Map(func(r rune) rune {
+		switch {
+		case r >= 'a' && r <= 'z', r >= 'A' && r <= 'Z', r >= '0' && r <= '9':
+			return r
+		case r == '-' || r == '_' || r == '.' || r == ' ':
+			return r
+		}
+		return -1
+	}, name)
 }
 
 func formatSpeed(bps float64) string {
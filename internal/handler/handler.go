@@ -46,7 +46,7 @@ func ClearCompletedHandler(store *storage.Storage, hub *websocket.Hub) http.Hand
 	}
 }
 
-func RetryHandler(store *storage.Storage, hub *websocket.Hub) http.HandlerFunc {
+func RetryHandler(store *storage.Storage, hub *websocket.Hub, downloader *download.Downloader) http.HandlerFunc {
 	return func(w http.ResponseWriter, r *http.Request) {
 		id := chi.URLParam(r, "id")
 		if id == "" {
@@ -64,6 +64,7 @@ func RetryHandler(store *storage.Storage, hub *websocket.Hub) http.HandlerFunc {
 		}
 
 		hub.BroadcastUpdate()
+		downloader.Wake()
 
 		w.Header().Set("Content-Type", "application/json")
 		json.NewEncoder(w).Encode(map[string]string{"status": "retried"})
@@ -134,7 +135,7 @@ func DeleteQueueItemHandler(store *storage.Storage, hub *websocket.Hub) http.Han
 	}
 }
 
-func AddToQueueHandler(store *storage.Storage, hub *websocket.Hub) http.HandlerFunc {
+func AddToQueueHandler(store *storage.Storage, hub *websocket.Hub, downloader *download.Downloader) http.HandlerFunc {
 	return func(w http.ResponseWriter, r *http.Request) {
 		var req struct {
 			Link string `json:"link"`
@@ -151,7 +152,7 @@ func AddToQueueHandler(store *storage.Storage, hub *websocket.Hub) http.HandlerF
 			return
 		}
 
-		name, sizeStr := utils.ExtractFileInfo(req.Link)
+		name, sizeStr, formURL := utils.ExtractFileInfo(req.Link)
 		size := utils.ParseSize(sizeStr)
 		slog.Info("Extracted info", "name", name, "sizeStr", sizeStr, "size", size)
 
@@ -161,10 +162,12 @@ func AddToQueueHandler(store *storage.Storage, hub *websocket.Hub) http.HandlerF
 			Name:    name,
 			Size:    size,
 			AddedAt: time.Now().Format(time.RFC3339),
+			FormURL: formURL,
 		}
 
 		store.AddPendingItem(item)
 		hub.BroadcastUpdate()
+		downloader.Wake()
 
 		w.Header().Set("Content-Type", "application/json")
 		json.NewEncoder(w).Encode(map[string]string{"status": "added"})
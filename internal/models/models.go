@@ -19,6 +19,8 @@ type Item struct {
 	Name    string `json:"name"`
 	Size    int64  `json:"size"`
 	AddedAt string `json:"addedAt"`
+	FormURL string `json:"formUrl,omitempty"`
+	ETag    string `json:"etag,omitempty"`
 }
 
 type FailedItem struct {
@@ -4,49 +4,112 @@ import (
 	"encoding/json"
 	"log/slog"
 	"os"
+	"slices"
 	"sync"
+	"time"
 
 	"fsqdgo/internal/models"
 )
 
+// flushDelay batches bursts of mutations into a single disk write.
+const flushDelay = 200 * time.Millisecond
+
 type Storage struct {
 	mu       sync.RWMutex
+	saveMu   sync.Mutex
 	filePath string
 	queue    models.Queue
+	dirty    chan struct{}
 }
 
 func New(dataDir string) *Storage {
 	os.MkdirAll(dataDir, os.ModePerm)
 
-	store := &Storage{filePath: dataDir + "/queue.json"}
+	store := &Storage{
+		filePath: dataDir + "/queue.json",
+		dirty:    make(chan struct{}, 1),
+	}
 	queue, err := store.LoadQueue()
 	if err != nil {
 		slog.Warn("Could not load existing queue, starting fresh", "error", err)
 		queue = models.Queue{}
 	}
 	store.queue = queue
+	go store.flusher()
 	return store
 }
 
-func (s *Storage) SaveQueue(data models.Queue) error {
-	s.mu.Lock()
-	defer s.mu.Unlock()
+// markDirty schedules a write-back; repeated calls coalesce into one.
+func (s *Storage) markDirty() {
+	select {
+	case s.dirty <- struct{}{}:
+	default:
+	}
+}
 
+func (s *Storage) flusher() {
+	for range s.dirty {
+		time.Sleep(flushDelay)
+		// Absorb signals that arrived during the delay; the save below
+		// persists their effect already.
+		select {
+		case <-s.dirty:
+		default:
+		}
+		s.save()
+	}
+}
+
+// Flush persists the current queue immediately, for shutdown.
+func (s *Storage) Flush() error {
+	return s.save()
+}
+
+func (s *Storage) save() error {
+	// Serialize writers: the flusher and a shutdown Flush must never
+	// interleave writes to the queue file.
+	s.saveMu.Lock()
+	defer s.saveMu.Unlock()
+
+	s.mu.RLock()
+	// Items mid-download are persisted at the head of pending, so a crash
+	// or restart re-queues them first instead of dropping them.
+	pending := make([]models.Item, 0, len(s.queue.Downloading)+len(s.queue.Pending))
+	pending = append(pending, s.queue.Downloading...)
+	pending = append(pending, s.queue.Pending...)
 	storageData := models.QueueForStorage{
-		Pending:   data.Pending,
-		Completed: data.Completed,
-		Failed:    data.Failed,
+		Pending:   pending,
+		Completed: slices.Clone(s.queue.Completed),
+		Failed:    slices.Clone(s.queue.Failed),
 	}
+	s.mu.RUnlock()
 
-	file, err := os.Create(s.filePath)
+	// Write to a temp file and rename so a failed save can never leave a
+	// truncated queue.json behind.
+	tmpPath := s.filePath + ".tmp"
+	file, err := os.Create(tmpPath)
 	if err != nil {
 		slog.Error("Failed to save queue", "error", err)
 		return err
 	}
-	defer file.Close()
 
-	encoder := json.NewEncoder(file)
-	return encoder.Encode(storageData)
+	if err := json.NewEncoder(file).Encode(storageData); err != nil {
+		file.Close()
+		os.Remove(tmpPath)
+		slog.Error("Failed to save queue", "error", err)
+		return err
+	}
+	if err := file.Close(); err != nil {
+		os.Remove(tmpPath)
+		slog.Error("Failed to save queue", "error", err)
+		return err
+	}
+
+	if err := os.Rename(tmpPath, s.filePath); err != nil {
+		slog.Error("Failed to save queue", "error", err)
+		return err
+	}
+	return nil
 }
 
 func (s *Storage) LoadQueue() (models.Queue, error) {
@@ -76,143 +139,174 @@ func (s *Storage) LoadQueue() (models.Queue, error) {
 func (s *Storage) GetQueue() models.Queue {
 	s.mu.RLock()
 	defer s.mu.RUnlock()
-	return s.queue
+	// Clone the lists so callers encode/iterate a stable snapshot while
+	// the worker and handlers keep mutating the live queue.
+	return models.Queue{
+		Downloading: slices.Clone(s.queue.Downloading),
+		Pending:     slices.Clone(s.queue.Pending),
+		Completed:   slices.Clone(s.queue.Completed),
+		Failed:      slices.Clone(s.queue.Failed),
+	}
+}
+
+func indexOf(items []models.Item, id string) int {
+	return slices.IndexFunc(items, func(item models.Item) bool { return item.Id == id })
+}
+
+func indexOfFailed(items []models.FailedItem, id string) int {
+	return slices.IndexFunc(items, func(item models.FailedItem) bool { return item.Id == id })
 }
 
 func (s *Storage) AddPendingItem(item models.Item) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
 	s.queue.Pending = append(s.queue.Pending, item)
-	go s.SaveQueue(s.queue)
+	s.markDirty()
 }
 
 func (s *Storage) RemoveItemById(id string) bool {
-	for i, item := range s.queue.Pending {
-		if item.Id == id {
-			s.queue.Pending = append(s.queue.Pending[:i], s.queue.Pending[i+1:]...)
-			go s.SaveQueue(s.queue)
-			return true
-		}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if i := indexOf(s.queue.Pending, id); i >= 0 {
+		s.queue.Pending = append(s.queue.Pending[:i], s.queue.Pending[i+1:]...)
+		s.markDirty()
+		return true
 	}
 
-	for i, item := range s.queue.Completed {
-		if item.Id == id {
-			s.queue.Completed = append(s.queue.Completed[:i], s.queue.Completed[i+1:]...)
-			go s.SaveQueue(s.queue)
-			return true
-		}
+	if i := indexOf(s.queue.Completed, id); i >= 0 {
+		s.queue.Completed = append(s.queue.Completed[:i], s.queue.Completed[i+1:]...)
+		s.markDirty()
+		return true
 	}
 
-	for i, item := range s.queue.Failed {
-		if item.Id == id {
-			s.queue.Failed = append(s.queue.Failed[:i], s.queue.Failed[i+1:]...)
-			go s.SaveQueue(s.queue)
-			return true
-		}
+	if i := indexOfFailed(s.queue.Failed, id); i >= 0 {
+		s.queue.Failed = append(s.queue.Failed[:i], s.queue.Failed[i+1:]...)
+		s.markDirty()
+		return true
 	}
 
 	return false
 }
 
 func (s *Storage) MovePendingItem(id string, up bool) bool {
-	for i, item := range s.queue.Pending {
-		if item.Id == id {
-			if up && i > 0 {
-				s.queue.Pending[i-1], s.queue.Pending[i] = s.queue.Pending[i], s.queue.Pending[i-1]
-				go s.SaveQueue(s.queue)
-				return true
-			} else if !up && i < len(s.queue.Pending)-1 {
-				s.queue.Pending[i], s.queue.Pending[i+1] = s.queue.Pending[i+1], s.queue.Pending[i]
-				go s.SaveQueue(s.queue)
-				return true
-			}
-			return false
-		}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	i := indexOf(s.queue.Pending, id)
+	if i < 0 {
+		return false
+	}
+	if up && i > 0 {
+		s.queue.Pending[i-1], s.queue.Pending[i] = s.queue.Pending[i], s.queue.Pending[i-1]
+		s.markDirty()
+		return true
+	} else if !up && i < len(s.queue.Pending)-1 {
+		s.queue.Pending[i], s.queue.Pending[i+1] = s.queue.Pending[i+1], s.queue.Pending[i]
+		s.markDirty()
+		return true
 	}
 	return false
 }
 
 func (s *Storage) ClearFailedItems() {
+	s.mu.Lock()
+	defer s.mu.Unlock()
 	s.queue.Failed = []models.FailedItem{}
-	go s.SaveQueue(s.queue)
+	s.markDirty()
 }
 
 func (s *Storage) ClearCompletedItems() {
+	s.mu.Lock()
+	defer s.mu.Unlock()
 	s.queue.Completed = []models.Item{}
-	go s.SaveQueue(s.queue)
+	s.markDirty()
 }
 
 func (s *Storage) RetryDownload(id string) bool {
-	for i, failedItem := range s.queue.Failed {
-		if failedItem.Id == id {
-			s.queue.Failed = append(s.queue.Failed[:i], s.queue.Failed[i+1:]...)
-
-			item := models.Item{
-				Id:      failedItem.Id,
-				Link:    failedItem.Link,
-				Name:    failedItem.Name,
-				Size:    failedItem.Size,
-				AddedAt: failedItem.AddedAt,
-			}
-
-			s.queue.Pending = append(s.queue.Pending, item)
-
-			go s.SaveQueue(s.queue)
-			return true
-		}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	i := indexOfFailed(s.queue.Failed, id)
+	if i < 0 {
+		return false
 	}
-	return false
+	failedItem := s.queue.Failed[i]
+	s.queue.Failed = append(s.queue.Failed[:i], s.queue.Failed[i+1:]...)
+
+	item := models.Item{
+		Id:      failedItem.Id,
+		Link:    failedItem.Link,
+		Name:    failedItem.Name,
+		Size:    failedItem.Size,
+		AddedAt: failedItem.AddedAt,
+		FormURL: failedItem.FormURL,
+		ETag:    failedItem.ETag,
+	}
+
+	s.queue.Pending = append(s.queue.Pending, item)
+
+	s.markDirty()
+	return true
 }
 
-func (s *Storage) MoveToDownloading(id string) (*models.Item, bool) {
-	for i, item := range s.queue.Pending {
-		if item.Id == id {
-			s.queue.Pending = append(s.queue.Pending[:i], s.queue.Pending[i+1:]...)
-			s.queue.Downloading = append(s.queue.Downloading, item)
-			go s.SaveQueue(s.queue)
-			return &item, true
-		}
+func (s *Storage) ClaimNextPending() (*models.Item, bool) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if len(s.queue.Pending) == 0 {
+		return nil, false
+	}
+	item := s.queue.Pending[0]
+	s.queue.Pending = s.queue.Pending[1:]
+	s.queue.Downloading = append(s.queue.Downloading, item)
+	s.markDirty()
+	return &item, true
+}
+
+// UpdateDownloadingItem refreshes the stored copy of an in-flight item
+// (size, ETag) so restarts and retries resume with current metadata.
+func (s *Storage) UpdateDownloadingItem(item models.Item) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if i := indexOf(s.queue.Downloading, item.Id); i >= 0 {
+		s.queue.Downloading[i] = item
+		s.markDirty()
 	}
-	return nil, false
 }
 
 func (s *Storage) MoveToCompleted(downloadedItem models.Item) bool {
-	for i, item := range s.queue.Downloading {
-		if item.Id == downloadedItem.Id {
-			s.queue.Downloading = append(s.queue.Downloading[:i], s.queue.Downloading[i+1:]...)
-			s.queue.Completed = append(s.queue.Completed, downloadedItem)
-			go s.SaveQueue(s.queue)
-			return true
-		}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	i := indexOf(s.queue.Downloading, downloadedItem.Id)
+	if i < 0 {
+		return false
 	}
-	return false
+	s.queue.Downloading = append(s.queue.Downloading[:i], s.queue.Downloading[i+1:]...)
+	s.queue.Completed = append(s.queue.Completed, downloadedItem)
+	s.markDirty()
+	return true
 }
 
 func (s *Storage) MoveToFailed(failedItem models.Item, errMsg string) bool {
-	for i, item := range s.queue.Downloading {
-		if item.Id == failedItem.Id {
-			s.queue.Downloading = append(s.queue.Downloading[:i], s.queue.Downloading[i+1:]...)
-
-			newItem := models.FailedItem{
-				Item:  item,
-				Error: errMsg,
-			}
-			s.queue.Failed = append(s.queue.Failed, newItem)
-
-			go s.SaveQueue(s.queue)
-			return true
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if i := indexOf(s.queue.Downloading, failedItem.Id); i >= 0 {
+		newItem := models.FailedItem{
+			Item:  s.queue.Downloading[i],
+			Error: errMsg,
 		}
+		s.queue.Downloading = append(s.queue.Downloading[:i], s.queue.Downloading[i+1:]...)
+		s.queue.Failed = append(s.queue.Failed, newItem)
+		s.markDirty()
+		return true
 	}
 
-	for i, item := range s.queue.Pending {
-		if item.Id == failedItem.Id {
-			s.queue.Pending = append(s.queue.Pending[:i], s.queue.Pending[i+1:]...)
-			newItem := models.FailedItem{
-				Item:  item,
-				Error: errMsg,
-			}
-			s.queue.Failed = append(s.queue.Failed, newItem)
-			go s.SaveQueue(s.queue)
-			return true
+	if i := indexOf(s.queue.Pending, failedItem.Id); i >= 0 {
+		newItem := models.FailedItem{
+			Item:  s.queue.Pending[i],
+			Error: errMsg,
 		}
+		s.queue.Pending = append(s.queue.Pending[:i], s.queue.Pending[i+1:]...)
+		s.queue.Failed = append(s.queue.Failed, newItem)
+		s.markDirty()
+		return true
 	}
 	return false
 }
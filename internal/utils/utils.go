@@ -3,44 +3,65 @@ package utils
 import (
 	"log/slog"
 	"net/http"
+	"net/url"
 	"strconv"
 	"strings"
+	"time"
 
 	"github.com/PuerkitoBio/goquery"
 )
 
-func ExtractFileInfo(url string) (name string, sizeStr string) {
-	slog.Info("Extracting file info", "url", url)
-	res, err := http.Get(url)
+// Shared client so repeated queue additions reuse pooled connections.
+var httpClient = &http.Client{Timeout: 30 * time.Second}
+
+func ExtractFileInfo(pageURL string) (name string, sizeStr string, formURL string) {
+	slog.Info("Extracting file info", "url", pageURL)
+	res, err := httpClient.Get(pageURL)
 	if err != nil {
 		slog.Error("Failed to fetch URL", "error", err)
-		return "Unknown", "Unknown size"
+		return "Unknown", "Unknown size", ""
 	}
 	defer res.Body.Close()
 	if res.StatusCode != 200 {
 		slog.Warn("Non-200 status code", "status", res.StatusCode)
-		return "Unknown", "Unknown size"
+		return "Unknown", "Unknown size", ""
 	}
 
 	doc, err := goquery.NewDocumentFromReader(res.Body)
 	if err != nil {
 		slog.Error("Failed to parse HTML", "error", err)
-		return "Unknown", "Unknown size"
+		return "Unknown", "Unknown size", ""
 	}
 
+	// One combined selector walks the document once for all three bits of
+	// info. The form action spares the worker a second fetch of this URL.
 	title := "Unknown"
-	doc.Find(".section_title").Each(func(i int, s *goquery.Selection) {
-		if t, ok := s.Attr("title"); ok {
-			title = t
-		}
-	})
-
 	size := "Unknown size"
-	doc.Find(".footer-video-size").Each(func(i int, s *goquery.Selection) {
-		size = strings.TrimSpace(s.Text())
+	formAction := ""
+	doc.Find(".section_title, .footer-video-size, form").Each(func(i int, s *goquery.Selection) {
+		switch {
+		case s.HasClass("section_title"):
+			if t, ok := s.Attr("title"); ok {
+				title = t
+			}
+		case s.HasClass("footer-video-size"):
+			size = strings.TrimSpace(s.Text())
+		default:
+			if action, ok := s.Attr("action"); ok && strings.HasPrefix(action, "/free/") {
+				formAction = action
+			}
+		}
 	})
+	resolvedForm := ""
+	if formAction != "" {
+		if base, err := url.Parse(pageURL); err == nil {
+			if resolved, err := base.Parse(formAction); err == nil {
+				resolvedForm = resolved.String()
+			}
+		}
+	}
 
-	return title, size
+	return title, size, resolvedForm
 }
 
 func ParseSize(sizeStr string) int64 {
@@ -37,7 +37,7 @@ func NewHub() *Hub {
 	return &Hub{
 		mu:        sync.Mutex{},
 		clients:   make(map[*websocket.Conn]bool),
-		broadcast: make(chan []byte),
+		broadcast: make(chan []byte, 64),
 		upgrader: websocket.Upgrader{
 			CheckOrigin: func(r *http.Request) bool { return true },
 		},
@@ -47,15 +47,31 @@ func NewHub() *Hub {
 func (h *Hub) Run() {
 	for {
 		msg := <-h.broadcast
+
+		// Snapshot the client set so slow network writes happen outside
+		// the lock and never block connects/disconnects.
 		h.mu.Lock()
+		conns := make([]*websocket.Conn, 0, len(h.clients))
 		for client := range h.clients {
-			err := client.WriteMessage(websocket.TextMessage, msg)
-			if err != nil {
+			conns = append(conns, client)
+		}
+		h.mu.Unlock()
+
+		var failed []*websocket.Conn
+		for _, client := range conns {
+			if err := client.WriteMessage(websocket.TextMessage, msg); err != nil {
 				client.Close()
+				failed = append(failed, client)
+			}
+		}
+
+		if len(failed) > 0 {
+			h.mu.Lock()
+			for _, client := range failed {
 				delete(h.clients, client)
 			}
+			h.mu.Unlock()
 		}
-		h.mu.Unlock()
 	}
 }
 
@@ -78,7 +94,12 @@ func (h *Hub) BroadcastProgress(update *ProgressUpdate) {
 		slog.Error("Failed to marshal progress update", "error", err)
 		return
 	}
-	h.broadcast <- msg
+	// Progress updates are transient and re-sent on the next tick, so
+	// drop rather than block the download loop when clients are slow.
+	select {
+	case h.broadcast <- msg:
+	default:
+	}
 }
 
 func (h *Hub) WsHandler(w http.ResponseWriter, r *http.Request) {